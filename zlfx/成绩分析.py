@@ -1,8 +1,12 @@
+import os
+import re
 import pandas as pd
 import numpy as np
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 from openpyxl.chart import BarChart, PieChart, Reference
+from openpyxl.utils import get_column_letter
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -30,6 +34,18 @@ EXCEL_LINES = {
 # 总分满分（4科×120 + 1科×100）
 TOTAL_FULL_SCORE = 580
 
+# PK表配置 - 班级名称 -> 该班本次考试文件，按总分名次两两配对（1vs2, 3vs4...）
+PK_CLASS_FILES = {
+    '本班': FILE_CURR,
+}
+PK_DAYS = ['周一', '周二', '周三', '周四', '周五']
+PK_OUTPUT_FILE = 'PK排班表_2025.xlsx'
+
+# 列式导出配置 - 可选 'parquet'、'csv'、'json'（逐行JSON），为空则只生成Excel
+EXPORT_FORMATS = []
+EXPORT_DIR = '成绩分析数据'
+WRITE_EXCEL_REPORT = True  # 设为False时只做列式导出，不保存Excel报告
+
 # ==================== 数据读取 ====================
 def read_exam_data(filepath):
     """读取考试数据，合并各科目sheet，自动检测命名方式"""
@@ -206,121 +222,10 @@ for idx, row in merged_df.iterrows():
 
 df_analysis = pd.DataFrame(student_data)
 
-# ==================== 创建Excel ====================
-wb = Workbook()
-wb.remove(wb.active)
-
-# 样式定义
-header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-header_font = Font(bold=True, color="FFFFFF", size=12)
-header_align = Alignment(horizontal="center", vertical="center", wrap_text=True)
-
-# ==================== Sheet 1: 学生个人分析报告 ====================
-print("创建学生个人分析报告...")
-ws1 = wb.create_sheet("学生个人分析报告", 0)
-
-ws1.column_dimensions['A'].width = 12
-ws1.column_dimensions['B'].width = 55
-ws1.column_dimensions['C'].width = 65
-
-ws1.append(['姓名', '成绩整体变化', '波动原因推测'])
-for col in range(1, 4):
-    ws1.cell(1, col).fill = header_fill
-    ws1.cell(1, col).font = header_font
-    ws1.cell(1, col).alignment = header_align
-
-# 数据行
-for idx, row in df_analysis.iterrows():
-    ws1.append([row['姓名'], row['成绩整体变化'], row['波动原因推测']])
-
-# 设置行高和样式
-for row_idx in range(2, len(df_analysis) + 2):
-    ws1.row_dimensions[row_idx].height = 45
-    for col in range(1, 4):
-        cell = ws1.cell(row_idx, col)
-        cell.alignment = Alignment(horizontal="left", vertical="center", wrap_text=True)
-
-        # 根据总分变化设置背景色（阈值30分）
-        if col == 2:
-            total_change = df_analysis.iloc[row_idx - 2]['总分_变化']
-            if pd.notna(total_change):
-                if total_change > 30:
-                    cell.fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-                elif total_change < -30:
-                    cell.fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-                else:
-                    cell.fill = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
-
-# ==================== Sheet 2: 各科详细成绩 ====================
-print("创建各科详细成绩表...")
-ws2 = wb.create_sheet("各科详细成绩")
-
-# 构建表头
-detail_headers = ['姓名']
-for s in SUBJECTS:
-    detail_headers.extend([f'{s}↑', f'{s}↓', f'{s}变化'])
-detail_headers.extend(['总分↑', '总分↓', '总分变化', '名次↑', '名次↓', '名次变化'])
-
-ws2.append(detail_headers)
-for col in range(1, len(detail_headers) + 1):
-    ws2.cell(1, col).fill = header_fill
-    ws2.cell(1, col).font = header_font
-    ws2.cell(1, col).alignment = header_align
-    ws2.column_dimensions[ws2.cell(1, col).column_letter].width = 10
-
-# 数据
-for idx, row in df_analysis.iterrows():
-    row_data = [row['姓名']]
-    for s in SUBJECTS:
-        row_data.extend([row[f'{s}_上次'], row[f'{s}_本次'], row[f'{s}_变化']])
-    row_data.extend([
-        row['总分_上次'], row['总分_本次'], row['总分_变化'],
-        row['名次_上次'], row['名次_本次'], row['名次_变化']
-    ])
-    ws2.append(row_data)
-
-# 样式设置 - 变化列高亮
-change_cols = [4, 7, 10, 13, 16, 19, 22]  # 各科变化列和名次变化列
-for row_idx in range(2, len(df_analysis) + 2):
-    for col in range(2, len(detail_headers) + 1):
-        cell = ws2.cell(row_idx, col)
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-
-        if col in change_cols:
-            value = cell.value
-            if value and isinstance(value, (int, float)) and not pd.isna(value):
-                if value > 0:
-                    cell.font = Font(color="00B050", bold=True)
-                    if col != 22:  # 名次变化列不加+号
-                        cell.value = f"+{value:.1f}" if isinstance(value, float) else f"+{value}"
-                elif value < 0:
-                    cell.font = Font(color="FF0000", bold=True)
-
-# ==================== Sheet 3: 班级统计分析 ====================
-print("创建班级统计分析...")
-ws3 = wb.create_sheet("班级统计分析")
-
-# 标题
-ws3['A1'] = '班级成绩质量分析报告'
-ws3['A1'].font = Font(bold=True, size=16, color="FFFFFF")
-ws3['A1'].fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-ws3['A1'].alignment = Alignment(horizontal="center", vertical="center")
-ws3.merge_cells('A1:H1')
-ws3.row_dimensions[1].height = 30
-
-# 统计数据表
-ws3.append([''])
-ws3['A3'] = '各科平均分统计'
-ws3['A3'].font = Font(bold=True, size=12)
-ws3.merge_cells('A3:G3')
-
-stat_headers = ['科目', '满分', '上次平均分', '本次平均分', '平均变化', '及格率本次(%)', '优秀率本次(%)']
-ws3.append(stat_headers)
-
-for col in range(1, 8):
-    ws3.cell(4, col).fill = header_fill
-    ws3.cell(4, col).font = header_font
-    ws3.cell(4, col).alignment = header_align
+# ==================== 班级统计 ====================
+print("计算班级统计...")
+STAT_HEADERS = ['科目', '满分', '上次平均分', '本次平均分', '平均变化', '及格率本次(%)', '优秀率本次(%)']
+PROGRESS_HEADERS = ['类别', '人数', '占比(%)', '平均进步幅度']
 
 # 计算统计
 stats = []
@@ -344,48 +249,6 @@ change_total = avg_curr_total - avg_prev_total
 stats.append(['总分', TOTAL_FULL_SCORE, round(avg_prev_total, 2), round(avg_curr_total, 2),
               round(change_total, 2), '-', '-'])
 
-for stat in stats:
-    ws3.append(stat)
-
-# 样式
-for row in range(5, 11):
-    for col in range(1, 8):
-        cell = ws3.cell(row, col)
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-        if col == 5:  # 变化列
-            if cell.value and isinstance(cell.value, (int, float)) and cell.value != 0:
-                cell.font = Font(color="00B050" if cell.value > 0 else "FF0000", bold=True)
-
-# 创建图表 1: 平均分对比
-chart1 = BarChart()
-chart1.title = "各科平均分对比（上次 vs 本次）"
-chart1.y_axis.title = "平均分"
-chart1.x_axis.title = "科目"
-chart1.style = 10
-chart1.height = 12
-chart1.width = 20
-
-data = Reference(ws3, min_col=3, min_row=4, max_row=9, max_col=4)
-cats = Reference(ws3, min_col=1, min_row=5, max_row=9)
-chart1.add_data(data, titles_from_data=True)
-chart1.set_categories(cats)
-
-ws3.add_chart(chart1, "J3")
-
-# 进步/退步统计
-ws3['A13'] = '学生进步情况统计'
-ws3['A13'].font = Font(bold=True, size=12)
-ws3.merge_cells('A13:F13')
-
-ws3.append([''])
-progress_headers = ['类别', '人数', '占比(%)', '平均进步幅度']
-ws3.append(progress_headers)
-
-for col in range(1, 5):
-    ws3.cell(15, col).fill = header_fill
-    ws3.cell(15, col).font = header_font
-    ws3.cell(15, col).alignment = header_align
-
 # 分类统计（总分满分580分）
 total_students = len(merged_df)
 big_progress = (merged_df['总分_变化'] > 50).sum()  # 大幅进步（>50分）
@@ -402,87 +265,368 @@ progress_stats = [
      round(merged_df[merged_df['总分_变化'] < 0]['总分_变化'].mean(), 2) if decline > 0 else 0]
 ]
 
-for stat in progress_stats:
-    ws3.append(stat)
-
-# 饼图：学生进步分布
-chart2 = PieChart()
-chart2.title = "学生进步情况分布"
-chart2.style = 10
-chart2.height = 12
-chart2.width = 15
-
-data = Reference(ws3, min_col=2, min_row=15, max_row=18)
-labels = Reference(ws3, min_col=1, min_row=16, max_row=18)
-chart2.add_data(data, titles_from_data=True)
-chart2.set_categories(labels)
-
-ws3.add_chart(chart2, "J21")
-
-# ==================== Sheet 4: 进步榜和退步榜 ====================
-print("创建进步榜...")
-ws4 = wb.create_sheet("进步榜_退步榜")
-
-# 进步榜
-ws4['A1'] = '进步榜 TOP 20'
-ws4['A1'].font = Font(bold=True, size=14, color="FFFFFF")
-ws4['A1'].fill = PatternFill(start_color="00B050", end_color="00B050", fill_type="solid")
-ws4.merge_cells('A1:F1')
-
-top_headers = ['排名', '姓名', '上次总分', '本次总分', '进步分数', '名次变化']
-ws4.append(top_headers)
-
-for col in range(1, 7):
-    ws4.cell(2, col).fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-    ws4.cell(2, col).font = Font(bold=True)
-    ws4.cell(2, col).alignment = header_align
-
-top20 = df_analysis.nlargest(20, '总分_变化')
-for i, (idx, row) in enumerate(top20.iterrows(), 1):
-    ws4.append([i, row['姓名'], row['总分_上次'], row['总分_本次'],
-                row['总分_变化'], row['名次_变化']])
-
-    # 前三名特殊标记
-    if i <= 3:
-        for col in range(1, 7):
-            ws4.cell(i + 2, col).fill = PatternFill(
-                start_color="FFD700" if i == 1 else "C0C0C0" if i == 2 else "CD7F32",
-                end_color="FFD700" if i == 1 else "C0C0C0" if i == 2 else "CD7F32",
-                fill_type="solid"
-            )
-
-# 需要关注学生（退步较大）
-ws4['A25'] = '需要关注学生（退步较大）'
-ws4['A25'].font = Font(bold=True, size=14, color="FFFFFF")
-ws4['A25'].fill = PatternFill(start_color="FF0000", end_color="FF0000", fill_type="solid")
-ws4.merge_cells('A25:F25')
-
-ws4.append(top_headers)
-for col in range(1, 7):
-    ws4.cell(26, col).fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-    ws4.cell(26, col).font = Font(bold=True)
-    ws4.cell(26, col).alignment = header_align
-
-bottom_students = df_analysis[df_analysis['总分_变化'] < 0].nsmallest(10, '总分_变化')
-if len(bottom_students) > 0:
-    for i, (idx, row) in enumerate(bottom_students.iterrows(), 1):
+# ==================== 列式导出 ====================
+TEXT_COLUMNS = {'学号', '姓名', '姓名_本次', '姓名_上次', '成绩整体变化', '波动原因推测', '科目', '类别'}
+INT_COLUMNS = {'满分', '人数'}  # 另外所有名次相关列均为整数
+EXPORT_SUFFIXES = {'parquet': 'parquet', 'csv': 'csv', 'json': 'jsonl'}
+
+def column_dtype(col):
+    """列的导出类型：文本为string，名次/人数/满分为可空整数Int64，分数、变化、比率为float64"""
+    if col in TEXT_COLUMNS:
+        return 'string'
+    if col in INT_COLUMNS or '名次' in col:
+        return 'Int64'
+    return 'float64'
+
+def to_stable_schema(df):
+    """按column_dtype统一列类型，'-'等非数值统一为空"""
+    out = pd.DataFrame(index=df.index)
+    for col in df.columns:
+        dtype = column_dtype(col)
+        if dtype == 'string':
+            out[col] = df[col].astype('string')
+        else:
+            out[col] = pd.to_numeric(df[col], errors='coerce').astype(dtype)
+    return out
+
+def export_table(df, name, fmt):
+    """按指定格式导出单张表，返回文件路径"""
+    path = os.path.join(EXPORT_DIR, f'{name}.{EXPORT_SUFFIXES[fmt]}')
+    if fmt == 'parquet':
+        df.to_parquet(path, index=False)
+    elif fmt == 'csv':
+        df.to_csv(path, index=False, encoding='utf-8')
+    else:
+        df.to_json(path, orient='records', lines=True, force_ascii=False)
+    return path
+
+if EXPORT_FORMATS:
+    unknown_formats = [fmt for fmt in EXPORT_FORMATS if fmt not in EXPORT_SUFFIXES]
+    if unknown_formats:
+        raise ValueError(f"不支持的导出格式: {unknown_formats}，可选: {list(EXPORT_SUFFIXES)}")
+    print("列式导出分析数据...")
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    export_tables = {
+        'merged_scores': merged_df,
+        'student_analysis': df_analysis,
+        'subject_stats': pd.DataFrame(stats, columns=STAT_HEADERS),
+        'progress_stats': pd.DataFrame(progress_stats, columns=PROGRESS_HEADERS),
+    }
+    for name, table in export_tables.items():
+        table = to_stable_schema(table)
+        for fmt in EXPORT_FORMATS:
+            path = export_table(table, name, fmt)
+            print(f"  {path} - {len(table)}行")
+
+# ==================== 创建Excel ====================
+def write_excel_report(output_file):
+    """生成带样式和图表的Excel分析报告（4个Sheet）"""
+    wb = Workbook()
+    wb.remove(wb.active)
+
+    # 样式定义
+    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+    header_font = Font(bold=True, color="FFFFFF", size=12)
+    header_align = Alignment(horizontal="center", vertical="center", wrap_text=True)
+
+    # ==================== Sheet 1: 学生个人分析报告 ====================
+    print("创建学生个人分析报告...")
+    ws1 = wb.create_sheet("学生个人分析报告", 0)
+
+    ws1.column_dimensions['A'].width = 12
+    ws1.column_dimensions['B'].width = 55
+    ws1.column_dimensions['C'].width = 65
+
+    ws1.append(['姓名', '成绩整体变化', '波动原因推测'])
+    for col in range(1, 4):
+        ws1.cell(1, col).fill = header_fill
+        ws1.cell(1, col).font = header_font
+        ws1.cell(1, col).alignment = header_align
+
+    # 数据行
+    for idx, row in df_analysis.iterrows():
+        ws1.append([row['姓名'], row['成绩整体变化'], row['波动原因推测']])
+
+    # 设置行高和样式
+    for row_idx in range(2, len(df_analysis) + 2):
+        ws1.row_dimensions[row_idx].height = 45
+        for col in range(1, 4):
+            cell = ws1.cell(row_idx, col)
+            cell.alignment = Alignment(horizontal="left", vertical="center", wrap_text=True)
+
+            # 根据总分变化设置背景色（阈值30分）
+            if col == 2:
+                total_change = df_analysis.iloc[row_idx - 2]['总分_变化']
+                if pd.notna(total_change):
+                    if total_change > 30:
+                        cell.fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
+                    elif total_change < -30:
+                        cell.fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
+                    else:
+                        cell.fill = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
+
+    # ==================== Sheet 2: 各科详细成绩 ====================
+    print("创建各科详细成绩表...")
+    ws2 = wb.create_sheet("各科详细成绩")
+
+    # 构建表头
+    detail_headers = ['姓名']
+    for s in SUBJECTS:
+        detail_headers.extend([f'{s}↑', f'{s}↓', f'{s}变化'])
+    detail_headers.extend(['总分↑', '总分↓', '总分变化', '名次↑', '名次↓', '名次变化'])
+
+    ws2.append(detail_headers)
+    for col in range(1, len(detail_headers) + 1):
+        ws2.cell(1, col).fill = header_fill
+        ws2.cell(1, col).font = header_font
+        ws2.cell(1, col).alignment = header_align
+        ws2.column_dimensions[ws2.cell(1, col).column_letter].width = 10
+
+    # 数据
+    for idx, row in df_analysis.iterrows():
+        row_data = [row['姓名']]
+        for s in SUBJECTS:
+            row_data.extend([row[f'{s}_上次'], row[f'{s}_本次'], row[f'{s}_变化']])
+        row_data.extend([
+            row['总分_上次'], row['总分_本次'], row['总分_变化'],
+            row['名次_上次'], row['名次_本次'], row['名次_变化']
+        ])
+        ws2.append(row_data)
+
+    # 样式设置 - 变化列高亮
+    change_cols = [4, 7, 10, 13, 16, 19, 22]  # 各科变化列和名次变化列
+    for row_idx in range(2, len(df_analysis) + 2):
+        for col in range(2, len(detail_headers) + 1):
+            cell = ws2.cell(row_idx, col)
+            cell.alignment = Alignment(horizontal="center", vertical="center")
+
+            if col in change_cols:
+                value = cell.value
+                if value and isinstance(value, (int, float)) and not pd.isna(value):
+                    if value > 0:
+                        cell.font = Font(color="00B050", bold=True)
+                        if col != 22:  # 名次变化列不加+号
+                            cell.value = f"+{value:.1f}" if isinstance(value, float) else f"+{value}"
+                    elif value < 0:
+                        cell.font = Font(color="FF0000", bold=True)
+
+    # ==================== Sheet 3: 班级统计分析 ====================
+    print("创建班级统计分析...")
+    ws3 = wb.create_sheet("班级统计分析")
+
+    # 标题
+    ws3['A1'] = '班级成绩质量分析报告'
+    ws3['A1'].font = Font(bold=True, size=16, color="FFFFFF")
+    ws3['A1'].fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+    ws3['A1'].alignment = Alignment(horizontal="center", vertical="center")
+    ws3.merge_cells('A1:H1')
+    ws3.row_dimensions[1].height = 30
+
+    # 统计数据表
+    ws3.append([''])
+    ws3['A3'] = '各科平均分统计'
+    ws3['A3'].font = Font(bold=True, size=12)
+    ws3.merge_cells('A3:G3')
+
+    ws3.append(STAT_HEADERS)
+
+    for col in range(1, 8):
+        ws3.cell(4, col).fill = header_fill
+        ws3.cell(4, col).font = header_font
+        ws3.cell(4, col).alignment = header_align
+
+    for stat in stats:
+        ws3.append(stat)
+
+    # 样式
+    for row in range(5, 11):
+        for col in range(1, 8):
+            cell = ws3.cell(row, col)
+            cell.alignment = Alignment(horizontal="center", vertical="center")
+            if col == 5:  # 变化列
+                if cell.value and isinstance(cell.value, (int, float)) and cell.value != 0:
+                    cell.font = Font(color="00B050" if cell.value > 0 else "FF0000", bold=True)
+
+    # 创建图表 1: 平均分对比
+    chart1 = BarChart()
+    chart1.title = "各科平均分对比（上次 vs 本次）"
+    chart1.y_axis.title = "平均分"
+    chart1.x_axis.title = "科目"
+    chart1.style = 10
+    chart1.height = 12
+    chart1.width = 20
+
+    data = Reference(ws3, min_col=3, min_row=4, max_row=9, max_col=4)
+    cats = Reference(ws3, min_col=1, min_row=5, max_row=9)
+    chart1.add_data(data, titles_from_data=True)
+    chart1.set_categories(cats)
+
+    ws3.add_chart(chart1, "J3")
+
+    # 进步/退步统计
+    ws3['A13'] = '学生进步情况统计'
+    ws3['A13'].font = Font(bold=True, size=12)
+    ws3.merge_cells('A13:F13')
+
+    ws3.append([''])
+    ws3.append(PROGRESS_HEADERS)
+
+    for col in range(1, 5):
+        ws3.cell(15, col).fill = header_fill
+        ws3.cell(15, col).font = header_font
+        ws3.cell(15, col).alignment = header_align
+
+    for stat in progress_stats:
+        ws3.append(stat)
+
+    # 饼图：学生进步分布
+    chart2 = PieChart()
+    chart2.title = "学生进步情况分布"
+    chart2.style = 10
+    chart2.height = 12
+    chart2.width = 15
+
+    data = Reference(ws3, min_col=2, min_row=15, max_row=18)
+    labels = Reference(ws3, min_col=1, min_row=16, max_row=18)
+    chart2.add_data(data, titles_from_data=True)
+    chart2.set_categories(labels)
+
+    ws3.add_chart(chart2, "J21")
+
+    # ==================== Sheet 4: 进步榜和退步榜 ====================
+    print("创建进步榜...")
+    ws4 = wb.create_sheet("进步榜_退步榜")
+
+    # 进步榜
+    ws4['A1'] = '进步榜 TOP 20'
+    ws4['A1'].font = Font(bold=True, size=14, color="FFFFFF")
+    ws4['A1'].fill = PatternFill(start_color="00B050", end_color="00B050", fill_type="solid")
+    ws4.merge_cells('A1:F1')
+
+    top_headers = ['排名', '姓名', '上次总分', '本次总分', '进步分数', '名次变化']
+    ws4.append(top_headers)
+
+    for col in range(1, 7):
+        ws4.cell(2, col).fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
+        ws4.cell(2, col).font = Font(bold=True)
+        ws4.cell(2, col).alignment = header_align
+
+    top20 = df_analysis.nlargest(20, '总分_变化')
+    for i, (idx, row) in enumerate(top20.iterrows(), 1):
         ws4.append([i, row['姓名'], row['总分_上次'], row['总分_本次'],
                     row['总分_变化'], row['名次_变化']])
 
-# ==================== 保存文件 ====================
-print("\n保存Excel文件...")
-output_file = '成绩分析报告_2025.xlsx'
-wb.save(output_file)
-
-print(f"\n[OK] Excel文件创建成功！")
-print(f"文件名：{output_file}")
-print(f"\n包含以下Sheet：")
-print(f"  1. 学生个人分析报告 - {len(df_analysis)}名学生个性化分析")
-print(f"  2. 各科详细成绩 - 所有科目详细对比")
-print(f"  3. 班级统计分析 - 包含2个图表")
-print(f"  4. 进步榜_退步榜 - TOP20及需要关注学生")
+        # 前三名特殊标记
+        if i <= 3:
+            for col in range(1, 7):
+                ws4.cell(i + 2, col).fill = PatternFill(
+                    start_color="FFD700" if i == 1 else "C0C0C0" if i == 2 else "CD7F32",
+                    end_color="FFD700" if i == 1 else "C0C0C0" if i == 2 else "CD7F32",
+                    fill_type="solid"
+                )
+
+    # 需要关注学生（退步较大）
+    ws4['A25'] = '需要关注学生（退步较大）'
+    ws4['A25'].font = Font(bold=True, size=14, color="FFFFFF")
+    ws4['A25'].fill = PatternFill(start_color="FF0000", end_color="FF0000", fill_type="solid")
+    ws4.merge_cells('A25:F25')
+
+    ws4.append(top_headers)
+    for col in range(1, 7):
+        ws4.cell(26, col).fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
+        ws4.cell(26, col).font = Font(bold=True)
+        ws4.cell(26, col).alignment = header_align
+
+    bottom_students = df_analysis[df_analysis['总分_变化'] < 0].nsmallest(10, '总分_变化')
+    if len(bottom_students) > 0:
+        for i, (idx, row) in enumerate(bottom_students.iterrows(), 1):
+            ws4.append([i, row['姓名'], row['总分_上次'], row['总分_本次'],
+                        row['总分_变化'], row['名次_变化']])
+
+    # ==================== 保存文件 ====================
+    print("\n保存Excel文件...")
+    wb.save(output_file)
+
+    print(f"\n[OK] Excel文件创建成功！")
+    print(f"文件名：{output_file}")
+    print(f"\n包含以下Sheet：")
+    print(f"  1. 学生个人分析报告 - {len(df_analysis)}名学生个性化分析")
+    print(f"  2. 各科详细成绩 - 所有科目详细对比")
+    print(f"  3. 班级统计分析 - 包含2个图表")
+    print(f"  4. 进步榜_退步榜 - TOP20及需要关注学生")
+
+if WRITE_EXCEL_REPORT:
+    write_excel_report('成绩分析报告_2025.xlsx')
+
 print(f"\n关键发现：")
 print(f"  - 班级平均总分：{avg_prev_total:.2f} -> {avg_curr_total:.2f} (变化{change_total:+.2f}分)")
 print(f"  - 大幅进步学生(>50分)：{big_progress}人 ({big_progress/total_students*100:.1f}%)")
 print(f"  - 退步学生：{decline}人 ({decline/total_students*100:.1f}%)")
 print(f"\n注：各科按原始满分制统计（语数英科120分，社会100分）")
+
+# ==================== PK排班表 ====================
+def build_pk_pairs(df):
+    """按总分名次两两配对（1vs2, 3vs4...），奇数人数时最后一组B组留空"""
+    ranked = df[df['姓名'].notna()].sort_values(
+        ['总分名次', '总分'], ascending=[True, False], kind='stable', na_position='last')
+    names = ranked['姓名'].astype(str).to_numpy(dtype=object)
+    if len(names) % 2:
+        names = np.append(names, '')
+    return pd.DataFrame(names.reshape(-1, 2), columns=['A组', 'B组'])
+
+def write_pk_sheet(wb, title, pairs):
+    """写入一个班级的PK表：A组、B组 + 5天×5科 + 合计，成绩区域留空手动填写"""
+    ws = wb.create_sheet(title)
+    day_width = len(SUBJECTS_SHORT)
+    total_cols = 2 + len(PK_DAYS) * day_width + 1
+
+    # 流式写入模式下列宽和合并单元格需在写行之前设置
+    for col in range(1, total_cols + 1):
+        ws.column_dimensions[get_column_letter(col)].width = 12 if col <= 2 else 5
+    ws.merged_cells.add('A1:B1')
+    for i in range(len(PK_DAYS)):
+        start = 3 + i * day_width
+        ws.merged_cells.add(f'{get_column_letter(start)}1:{get_column_letter(start + day_width - 1)}1')
+
+    def styled_row(values, size):
+        cells = []
+        for value in values:
+            cell = WriteOnlyCell(ws, value=value)
+            cell.font = Font(bold=True, size=size)
+            cell.alignment = Alignment(horizontal="center", vertical="center")
+            cells.append(cell)
+        return cells
+
+    day_row = ['分组', '']
+    for day in PK_DAYS:
+        day_row.extend([day] + [''] * (day_width - 1))
+    day_row.append('合计')
+    ws.append(styled_row(day_row, 14))
+    ws.append(styled_row(['A组', 'B组'] + SUBJECTS_SHORT * len(PK_DAYS) + [''], 12))
+
+    for a, b in pairs.itertuples(index=False):
+        ws.append([a, b])
+
+print("\n生成PK排班表...")
+pk_wb = Workbook(write_only=True)
+pk_summary = []
+for class_name, filepath in PK_CLASS_FILES.items():
+    try:
+        df_class = df_curr if filepath == FILE_CURR else read_exam_data(filepath)
+        if df_class is None:
+            print(f"  跳过{class_name}：读取{filepath}失败")
+            continue
+        pairs = build_pk_pairs(df_class)
+        # Sheet名称不允许包含 \/?*[]: 且最长31个字符
+        title = re.sub(r'[\\/?*\[\]:]', '_', f'{class_name}PK排班表')[:31]
+        write_pk_sheet(pk_wb, title, pairs)
+    except Exception as e:
+        print(f"  跳过{class_name}：生成PK表失败: {e}")
+        continue
+    pk_summary.append((class_name, len(pairs)))
+
+if pk_summary:
+    pk_wb.save(PK_OUTPUT_FILE)
+    print(f"[OK] PK排班表创建成功！文件名：{PK_OUTPUT_FILE}")
+    for class_name, pair_count in pk_summary:
+        print(f"  - {class_name}：{pair_count}组")